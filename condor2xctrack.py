@@ -30,11 +30,14 @@ Example:
 """
 
 import argparse
-import re
+import queue
 import socket
 import sys
-from dataclasses import dataclass
+import threading
+import time
 from datetime import datetime, UTC
+from functools import reduce
+from operator import xor
 
 import serial
 
@@ -44,82 +47,230 @@ DEFAULT_UDP_SERVER_PORT = 10110
 # default baud rate of the source serial port (115200-8-N-1)
 DEFAULT_SERIAL_BAUDRATE = 4800
 
+# serial input buffer size in bytes
+READ_BUFFER_SIZE = 8192
+
+# max. number of read batches queued between reader thread and forwarder
+READ_QUEUE_SIZE = 64
+
 # for the time being we only touch the RMC sentence
 # see http://www.nmea.de/nmea0183datensaetze.html#rmc
 RMC_DATE_FIELD_INDEX = 9
 
+SECONDS_PER_DAY = 86400
 
-@dataclass
-class NmeaSentence:
-    NMEA_MSG_PATTERN = r"\$([^\*]+)\*([\w]+)\s*"
+# two digit upper case hex representation of each CRC value
+_HEX = [f"{i:02X}".encode("ascii") for i in range(256)]
 
-    items: list
+# CRC value of each two digit hex representation (either case)
+_HEX_VALUES = {h: i for i, h in enumerate(_HEX)}
+_HEX_VALUES.update({h.lower(): i for i, h in enumerate(_HEX)})
 
-    @property
-    def record_id(self):
-        return self.items[0]
+# below this payload length the plain per-byte XOR is faster than word folding
+CRC_SWAR_MIN_LENGTH = 48
 
-    @property
-    def crc(self):
-        data = self._items_str
-        crc = 0
-        for v in data:
-            crc ^= ord(v)
-        return f"{crc:02X}"
 
-    @property
-    def _items_str(self):
-        return ",".join(self.items)
+def _xor_reduce(data):
+    if len(data) < CRC_SWAR_MIN_LENGTH:
+        return reduce(xor, data, 0)
+    # treat the whole payload as one integer and XOR its upper half onto the
+    # lower half until a 64-bit word is left, then fold the 8 lanes into a
+    # single byte; no Python level loop over the individual words
+    acc = int.from_bytes(data, "little")
+    width = len(data)
+    while width > 8:
+        width = (width + 1) // 2
+        acc = (acc & ((1 << (8 * width)) - 1)) ^ (acc >> (8 * width))
+    acc ^= acc >> 32
+    acc ^= acc >> 16
+    acc ^= acc >> 8
+    return acc & 0xFF
 
-    @classmethod
-    def from_str(cls, msg):
-        m = re.match(NmeaSentence.NMEA_MSG_PATTERN, msg)
-        if not m:
-            raise ValueError(f"Could not parse message '{msg}'")
 
-        items = m.group(1).split(",")
-        crc = m.group(2)
+def _decode(data):
+    # readable text of a raw sentence (or part of it) for error messages
+    return data.decode("ascii", "replace")
 
-        nmea = NmeaSentence(items=items)
-        if nmea.crc != crc:
-            raise ValueError(
-                f"Invalid CRC for message '{msg}' (expected: {nmea.crc}, actual: {crc})"
-            )
 
-        return nmea
+class NmeaSentence:
+    __slots__ = ("items",)
 
-    def to_str(self):
-        return f"${self._items_str}*{self.crc}\r\n"
+    def __init__(self, items):
+        self.items = items
 
+    def crc(self):
+        return _HEX[_xor_reduce(self._items_bytes())]
 
-def format_message(msg):
-    # pass through all NMEA sentences without furhter processing
-    # except the ones we need to touch
-    if msg.startswith(b"$GPRMC,"):
-        m = NmeaSentence.from_str(msg.decode("ascii"))
-        if m.record_id == "GPRMC":
-            # add missing date field in Condor2 NMEA RMC message
-            m.items.insert(
-                RMC_DATE_FIELD_INDEX,
-                datetime.now(UTC).date().strftime("%d%m%y"),
-            )
-        msg = m.to_str().encode("ascii")
-    return msg
+    def _items_bytes(self):
+        return b",".join(self.items)
+
+    @classmethod
+    def from_str(cls, msg, validate=False):
+        # NMEA framing is $<payload>*<crc>, split on raw bytes
+        msg = msg.strip()
+        if not msg.startswith(b"$"):
+            raise ValueError(f"Could not parse message '{_decode(msg)}'")
+        payload, sep, crc = msg[1:].rpartition(b"*")
+        if not sep or not payload:
+            raise ValueError(f"Could not parse message '{_decode(msg)}'")
+
+        items = payload.split(b",")
+
+        nmea = NmeaSentence(items)
+        if validate:
+            expected = nmea.crc()
+            if expected != crc:
+                raise ValueError(
+                    f"Invalid CRC for message '{_decode(msg)}' "
+                    f"(expected: {_decode(expected)}, actual: {_decode(crc)})"
+                )
+
+        return nmea
+
+
+# UTC date field value (ddmmyy), refreshed on date rollover only
+_date_cache = {"day": None, "str": b""}
+
+
+def _rmc_date():
+    # days since the epoch, only build a date on UTC date rollover
+    today = int(time.time() // SECONDS_PER_DAY)
+    if today != _date_cache["day"]:
+        date = datetime.fromtimestamp(today * SECONDS_PER_DAY, UTC)
+        _date_cache["str"] = date.strftime("%d%m%y").encode("ascii")
+        _date_cache["day"] = today
+    return _date_cache["str"]
+
+
+def _insert_rmc_date(msg):
+    # insert the date field by splicing the raw sentence; since the CRC is a
+    # plain XOR over the payload, the new CRC is the old one XORed with the
+    # inserted bytes
+    star = msg.rfind(b"*")
+    crc = _HEX_VALUES.get(msg[star + 1:star + 3]) if star != -1 else None
+    if crc is None or msg[star + 3:].strip():
+        raise ValueError(f"Could not parse message '{_decode(msg.strip())}'")
+
+    pos = 0
+    for _ in range(RMC_DATE_FIELD_INDEX):
+        pos = msg.find(b",", pos + 1, star)
+        if pos == -1:
+            pos = star
+            break
+    field = b"," + _rmc_date()
+    crc ^= _xor_reduce(field)
+
+    # join the parts in one go; for sentences this short it is cheaper than
+    # splicing into a preallocated buffer
+    return b"".join((msg[:pos], field, msg[pos:star + 1], _HEX[crc], b"\r\n"))
+
+
+# handlers for the NMEA sentences we need to touch, keyed by the 7 byte
+# sentence prefix ("$" + talker + type + ","); all other sentences are
+# passed through without further processing
+MESSAGE_HANDLERS = {
+    # add missing date field in Condor2 NMEA RMC message
+    b"$GPRMC,": _insert_rmc_date,
+}
+
+
+def _validated(handler):
+    def validate_and_handle(msg):
+        NmeaSentence.from_str(msg, validate=True)
+        return handler(msg)
+    return validate_and_handle
+
+
+def message_handlers(validate_crc=False):
+    if validate_crc:
+        return {k: _validated(h) for k, h in MESSAGE_HANDLERS.items()}
+    return MESSAGE_HANDLERS
+
+
+def read_messages(ser):
+    # read whatever arrived since the last poll in one call instead of
+    # letting readline() do many small reads, then yield the complete lines
+    # of each read as one batch; a fixed buffer with read/write pointers
+    # avoids reallocating per line
+    buf = bytearray(READ_BUFFER_SIZE)
+    view = memoryview(buf)
+    read_ptr = write_ptr = 0
+    while True:
+        if read_ptr == write_ptr:
+            read_ptr = write_ptr = 0
+        elif read_ptr and (read_ptr > READ_BUFFER_SIZE // 2 or write_ptr == len(buf)):
+            # move the incomplete line to the front of the buffer
+            buf[:write_ptr - read_ptr] = buf[read_ptr:write_ptr]
+            write_ptr -= read_ptr
+            read_ptr = 0
+        if write_ptr == len(buf):
+            # a single line does not fit, grow the buffer
+            view.release()
+            buf.extend(bytes(len(buf)))
+            view = memoryview(buf)
+
+        n = min(max(1, ser.in_waiting), len(buf) - write_ptr)
+        write_ptr += ser.readinto(view[write_ptr:write_ptr + n])
+        batch = []
+        while (i := buf.find(b"\n", read_ptr, write_ptr)) != -1:
+            batch.append(bytes(view[read_ptr:i + 1]))
+            read_ptr = i + 1
+        if batch:
+            yield batch
+
+
+def read_messages_threaded(ser):
+    # read on a background thread so that serial reads overlap with
+    # formatting and sending (the GIL is released during blocking I/O);
+    # the bounded queue applies backpressure to the reader
+    batches = queue.Queue(maxsize=READ_QUEUE_SIZE)
+
+    def reader():
+        try:
+            for batch in read_messages(ser):
+                batches.put(batch)
+        except Exception as e:
+            batches.put(e)
+
+    threading.Thread(target=reader, daemon=True).start()
+    while True:
+        try:
+            # use a timeout to keep Ctrl-c working while waiting
+            batch = batches.get(timeout=1)
+        except queue.Empty:
+            continue
+        if isinstance(batch, Exception):
+            raise batch
+        yield batch
 
 
 def forward_to_udp(config):
-    out_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    # resolve the target once and connect, so each datagram is sent
+    # without passing (and parsing) the destination address
+    family, sock_type, proto, _, addr = socket.getaddrinfo(
+        config.udp_server_ip, config.udp_server_port, type=socket.SOCK_DGRAM
+    )[0]
+    out_socket = socket.socket(family, sock_type, proto)
+    out_socket.connect(addr)
 
     with serial.Serial(config.input_serial_port, config.input_serial_baudrate, timeout=1) as ser:
         print("NMEA connector started, forwarding to UDP (press Ctrl-c to stop)...")
         msg_count = 0
-        while True:
-            msg = ser.readline()
-            if not msg:
-                continue
-            msg = format_message(msg)
-            out_socket.sendto(msg, (config.udp_server_ip, config.udp_server_port))
-            msg_count += 1 
+        # bind hot loop lookups to locals
+        send = out_socket.send
+        get_handler = message_handlers(config.validate_crc).get
+        for batch in read_messages_threaded(ser):
+            # one sentence per datagram, as expected by the receiver
+            for msg in batch:
+                handler = get_handler(msg[:7])
+                try:
+                    send(handler(msg) if handler else msg)
+                except ConnectionError:
+                    # connected UDP sockets report ICMP port unreachable
+                    # (refused on Linux, reset on Windows), e.g. while XCTrack
+                    # is not listening; drop the message
+                    continue
+                msg_count += 1
             print(f"Forwarded Messages: {msg_count}", end="\r")
 
 def forward_to_serial(config):
@@ -127,13 +278,16 @@ def forward_to_serial(config):
           serial.Serial(config.output_serial_port, config.output_serial_baudrate, timeout=1) as ser_out):
         print("NMEA connector started, forwarding to serial (press Ctrl-c to stop)...")
         msg_count = 0
-        while True:
-            msg = ser_in.readline()
-            if not msg:
-                continue
-            msg = format_message(msg)
-            ser_out.write(msg)
-            msg_count += 1 
+        # bind hot loop lookups to locals
+        write = ser_out.write
+        get_handler = message_handlers(config.validate_crc).get
+        for batch in read_messages_threaded(ser_in):
+            # serial output is a byte stream, write the whole batch at once
+            write(b"".join([
+                handler(msg) if (handler := get_handler(msg[:7])) else msg
+                for msg in batch
+            ]))
+            msg_count += len(batch)
             print(f"Forwarded Messages: {msg_count}", end="\r")
 
 def process_nmea(config):
@@ -189,6 +343,12 @@ def main():
         help="XCTrack target UDP port",
         required=False
     )
+    parser.add_argument(
+        "--validate_crc",
+        action="store_true",
+        help="Validate the CRC of received sentences before modifying them",
+        required=False
+    )
     args = parser.parse_args()
 
     if ((not args.udp_server_ip) and (not args.output_serial_port)):